@@ -10,22 +10,26 @@ Command-line interface for email threat analysis with:
 """
 
 import argparse
+import fnmatch
+import io
+import itertools
+import os
+import re
 import sys
 import time
 from pathlib import Path
 sys.path.append('.')
 
-from scripts.final_pixel_detector import FinalPixelDetector
 from scripts.advanced_reporting import AdvancedReportingSystem
+from scripts.shared_detector import get_detector
 
 def analyze_single_email(email_path: str, export_json: bool = False, 
                         generate_dashboard: bool = False):
     """Analyze single email with optional reporting."""
     print(f"🔍 Analyzing: {email_path}")
     
-    # Initialize detector
-    detector = FinalPixelDetector()
-    detector.initialize()
+    # Initialize detector (shared per process)
+    detector = get_detector()
     
     # Initialize reporting
     reporting = AdvancedReportingSystem()
@@ -38,11 +42,13 @@ def analyze_single_email(email_path: str, export_json: bool = False,
     # Generate threat report
     threat_report = reporting.generate_threat_report(result, email_path, analysis_duration)
     
-    # Print summary
-    print(f"\n📊 Analysis Results:")
-    print(f"  Total threats: {len(threat_report.tracking_pixels)}")
-    print(f"  Risk level: {threat_report.risk_assessment['overall_risk']}")
-    print(f"  Analysis time: {analysis_duration:.3f}s")
+    # Print summary (buffered, one write)
+    summary = io.StringIO()
+    summary.write(f"\n📊 Analysis Results:\n")
+    summary.write(f"  Total threats: {len(threat_report.tracking_pixels)}\n")
+    summary.write(f"  Risk level: {threat_report.risk_assessment['overall_risk']}\n")
+    summary.write(f"  Analysis time: {analysis_duration:.3f}s\n")
+    sys.stdout.write(summary.getvalue())
     
     # Export JSON if requested
     if export_json:
@@ -52,31 +58,64 @@ def analyze_single_email(email_path: str, export_json: bool = False,
     # Generate dashboard if requested
     if generate_dashboard:
         dashboard_file = reporting.generate_visual_dashboard([threat_report])
-        print(f"  Dashboard: {dashboard_file}")
+        if dashboard_file:
+            print(f"  Dashboard: {dashboard_file}")
     
     return threat_report
 
+def _expand_email_paths(path_pattern: str) -> list:
+    """Expand a file path or glob pattern with a single directory scan."""
+    path = Path(path_pattern)
+    if path.is_file():
+        return [str(path)]
+    
+    parent = path.parent
+    if not parent.is_dir():
+        return []
+    
+    # DirEntry.is_file() reuses the scandir stat data, no extra syscall per entry
+    name_matcher = re.compile(fnmatch.translate(path.name))
+    with os.scandir(parent) as entries:
+        return sorted(str(parent / entry.name) for entry in entries
+                      if name_matcher.match(entry.name) and entry.is_file())
+
 def bulk_analyze_emails(email_paths: list, export_json: bool = False,
-                       generate_dashboard: bool = False):
-    """Bulk analyze multiple emails."""
+                       generate_dashboard: bool = False, threads: int = 4,
+                       export_zip: bool = False, stream: bool = False):
+    """Bulk analyze multiple emails across a pool of worker processes."""
     print(f"🚀 Bulk analyzing {len(email_paths)} emails...")
     
-    # Initialize systems
-    detector = FinalPixelDetector()
-    detector.initialize()
-    
     reporting = AdvancedReportingSystem()
     
-    # Bulk analysis
-    bulk_report = reporting.bulk_analyze_emails(email_paths, detector)
+    # Bulk analysis on a process pool - workers fork after the shared detector
+    # is loaded, so they inherit it instead of re-initializing
+    bulk_report = reporting.bulk_analyze_emails(
+        email_paths, get_detector(), max_workers=threads,
+        generate_dashboard=generate_dashboard, stream_reports=stream
+    )
     
-    # Print summary
-    print(f"\n📊 Bulk Analysis Summary:")
-    print(f"  Emails processed: {bulk_report.total_emails}")
-    print(f"  Total threats: {bulk_report.summary_stats['total_threats_detected']}")
-    print(f"  Clean emails: {bulk_report.summary_stats['clean_emails']}")
-    print(f"  Processing time: {bulk_report.processing_time:.2f}s")
-    print(f"  Average per email: {bulk_report.processing_time/bulk_report.total_emails:.3f}s")
+    # Print summary (buffered, one write)
+    summary = io.StringIO()
+    summary.write(f"\n📊 Bulk Analysis Summary:\n")
+    summary.write(f"  Emails processed: {bulk_report.total_emails}\n")
+    summary.write(f"  Total threats: {bulk_report.summary_stats['total_threats_detected']}\n")
+    summary.write(f"  Clean emails: {bulk_report.summary_stats['clean_emails']}\n")
+    summary.write(f"  Processing time: {bulk_report.processing_time:.2f}s\n")
+    summary.write(f"  Average per email: {bulk_report.processing_time/bulk_report.total_emails:.3f}s\n")
+    sys.stdout.write(summary.getvalue())
+    
+    # Export all per-email reports to a single JSONL file if requested
+    # (streamed runs already wrote them as they completed)
+    if stream:
+        print(f"  JSONL exported: {bulk_report.reports_file}")
+    elif export_json:
+        jsonl_file = reporting.export_jsonl_report(bulk_report.email_reports)
+        print(f"  JSONL exported: {jsonl_file}")
+    
+    # Bundle per-email reports into one archive if requested
+    if export_zip:
+        zip_file = reporting.export_zip_archive(bulk_report.email_reports)
+        print(f"  Archive exported: {zip_file}")
     
     return bulk_report
 
@@ -110,14 +149,20 @@ Examples:
                        help='Export results to JSON format')
     parser.add_argument('--dashboard', action='store_true',
                        help='Generate visual dashboard')
+    parser.add_argument('--zip', action='store_true',
+                       help='Bundle per-email JSON reports into a zip archive (bulk mode)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Stream per-email reports to JSONL instead of holding them in memory (bulk mode)')
     parser.add_argument('--output-dir', type=str, default='reports',
                        help='Output directory for reports')
     
     # Performance options
     parser.add_argument('--threads', type=int, default=4,
-                       help='Number of threads for parallel processing')
+                       help='Number of worker processes for bulk analysis')
     
     args = parser.parse_args()
+    if args.stream and args.zip:
+        parser.error('--zip needs the per-email reports in memory; drop --stream')
     
     print("🛡️ Advanced Email Threat Analysis Tool")
     print("=" * 50)
@@ -134,23 +179,16 @@ Examples:
             
         elif args.bulk:
             # Bulk analysis
-            email_paths = []
-            for path_pattern in args.bulk:
-                path = Path(path_pattern)
-                if path.is_file():
-                    email_paths.append(str(path))
-                else:
-                    # Handle glob patterns
-                    parent = path.parent
-                    pattern = path.name
-                    matches = list(parent.glob(pattern))
-                    email_paths.extend([str(m) for m in matches if m.is_file()])
+            email_paths = list(itertools.chain.from_iterable(
+                _expand_email_paths(path_pattern) for path_pattern in args.bulk
+            ))
             
             if not email_paths:
                 print("❌ No email files found")
                 sys.exit(1)
             
-            bulk_analyze_emails(email_paths, args.json, args.dashboard)
+            bulk_analyze_emails(email_paths, args.json, args.dashboard, args.threads,
+                                args.zip, args.stream)
     
     except KeyboardInterrupt:
         print("\n⚠️ Analysis interrupted by user")
@@ -14,15 +14,18 @@ This is the main entry point for the complete auto-update system.
 """
 
 import asyncio
+import collections
+import heapq
+import itertools
 import time
-import json
+import orjson
 import logging
 import threading
-import queue
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
-import schedule
+from dataclasses import dataclass, asdict, fields
+from datetime import datetime, timedelta
 import signal
 import sys
 
@@ -31,6 +34,7 @@ from realtime_github_sync import GitHubChangeMonitor, ChangeEvent
 from pattern_validator import PatternValidator, ValidationResult
 from pattern_version_control import PatternVersionControl, PatternCommit
 from optimized_pattern_engine import OptimizedPatternEngine
+from import_github_rules import _COMMENT_PREFIXES
 
 # Setup logging
 logging.basicConfig(
@@ -43,7 +47,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class AutoUpdateConfig:
     """Configuration for the auto-update system"""
     enabled: bool = True
@@ -56,7 +60,7 @@ class AutoUpdateConfig:
     pattern_refresh_interval: int = 3600  # 1 hour
     emergency_stop: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class SystemHealth:
     """System health metrics"""
     timestamp: float
@@ -68,48 +72,119 @@ class SystemHealth:
     errors_per_hour: int
     status: str  # healthy, degraded, critical
 
+# SystemHealth is flat, so a field-by-field copy replaces the recursive asdict()
+_SYSTEM_HEALTH_FIELDS = tuple(f.name for f in fields(SystemHealth))
+
+# Only SystemHealth snapshots are pooled. ChangeEvents are not: the GitHub monitor
+# creates them on its own loop, they cross several queues with no single point
+# where they die, and changes are rare next to health ticks
+class ObjectPool:
+    """Free list of reusable objects; acquire() falls back to the factory when empty"""
+    
+    def __init__(self, factory):
+        self._factory = factory
+        self._free = []
+    
+    def preallocate(self, count: int):
+        """Fill the free list up to count objects"""
+        while len(self._free) < count:
+            self._free.append(self._factory())
+    
+    def acquire(self):
+        # pop()/append() are atomic, so executor threads can share the pool
+        try:
+            return self._free.pop()
+        except IndexError:
+            return self._factory()
+    
+    def release(self, obj):
+        self._free.append(obj)
+
+def _new_system_health() -> SystemHealth:
+    return SystemHealth(0.0, 0.0, 0.0, 0, 0.0, 0.0, 0, "healthy")
+
 class AutoUpdateOrchestrator:
     """Central orchestrator for the complete auto-update system"""
     
+    # Changes are passed between pipeline stages in blocks of at most this many
+    QUEUE_BATCH_SIZE = 50
+    
+    # Upper bound on changes waiting in each pipeline queue
+    QUEUE_MAX_CHANGES = 1024
+    
+    # Validation failures are appended through one buffered handle, flushed on a timer
+    FAILURE_LOG_BUFFER_SIZE = 64 * 1024
+    FAILURE_LOG_FLUSH_INTERVAL = 10
+    
     def __init__(self, config_file: str = None):
         self.base_path = Path(__file__).parent.parent
         self.config_file = config_file or str(self.base_path / "autoupdate_config.json")
         
         # Load configuration
         self.config = self._load_config()
+        self._config_dict = None  # asdict(self.config), rebuilt lazily after a config change
         
         # Initialize components
-        self.github_monitor = GitHubChangeMonitor()
+        self.github_monitor = GitHubChangeMonitor(change_listener=self._on_change_detected)
         self.pattern_validator = PatternValidator()
         self.version_control = PatternVersionControl()
         self.pattern_engine = None  # Will be initialized later
         
         # System state
         self.running = False
-        self.health_history = []
+        self.health_history = collections.deque(maxlen=100)
+        self.health_pool = ObjectPool(_new_system_health)  # Recycles SystemHealth snapshots
         self.rollback_count = 0
-        self.last_update = time.time()
+        self.last_update = time.time()  # Wall-clock timestamp, reported in status
+        
+        # Start time on both clocks: wall for reporting, monotonic for intervals
+        self._started_at_wall = None
+        self._started_at_mono = None
+        
+        # Bounded queues for inter-component communication (consumed on the pipeline loop)
+        self._create_queues()
+        
+        # Pipeline event loop, run on its own thread so start()/stop() stay synchronous
+        self.loop = None
+        self.loop_thread = None
+        self.tasks = []
         
-        # Queues for inter-component communication
-        self.validation_queue = queue.Queue()
-        self.update_queue = queue.Queue()
-        self.health_queue = queue.Queue()
+        # Dedicated executor for CPU-heavy pattern validation, so a large batch never
+        # occupies the default executor used for file and version-control I/O
+        self._cpu_pool = None
         
-        # Threads
-        self.threads = []
+        # Periodic jobs: min-heap of (deadline, sequence, interval, callback)
+        self.scheduled_jobs = []
+        self._job_sequence = itertools.count()
+        
+        # Long-lived validation failure log (opened in start(), closed in stop())
+        self.failure_log_file = self.base_path / "autoupdate" / "validation_failures.jsonl"
+        self._failure_log = None
         
         # Shutdown handler
         signal.signal(signal.SIGINT, self._shutdown_handler)
         signal.signal(signal.SIGTERM, self._shutdown_handler)
     
+    def _create_queues(self):
+        """Create the pipeline queues.
+        
+        A full downstream queue blocks the stage feeding it; only the monitor hand-off,
+        which cannot block, drops the oldest change instead. Queues bind to the loop
+        that first waits on them, so every pipeline loop needs fresh ones.
+        """
+        max_batches = self.QUEUE_MAX_CHANGES // self.QUEUE_BATCH_SIZE
+        self.change_queue = asyncio.Queue(maxsize=self.QUEUE_MAX_CHANGES)
+        self.validation_queue = asyncio.Queue(maxsize=max_batches)
+        self.update_queue = asyncio.Queue(maxsize=max_batches)
+    
     def _load_config(self) -> AutoUpdateConfig:
         """Load configuration from file"""
         config_path = Path(self.config_file)
         
         if config_path.exists():
             try:
-                with open(config_path, 'r') as f:
-                    config_data = json.load(f)
+                with open(config_path, 'rb') as f:
+                    config_data = orjson.loads(f.read())
                 return AutoUpdateConfig(**config_data)
             except Exception as e:
                 logger.warning(f"Failed to load config: {e}, using defaults")
@@ -121,8 +196,14 @@ class AutoUpdateOrchestrator:
     
     def _save_config(self, config: AutoUpdateConfig):
         """Save configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(asdict(config), f, indent=2)
+        with open(self.config_file, 'wb') as f:
+            f.write(orjson.dumps(asdict(config), option=orjson.OPT_INDENT_2))
+    
+    def _get_config_dict(self) -> Dict[str, Any]:
+        """Config as a dict, cached until the config is changed"""
+        if self._config_dict is None:
+            self._config_dict = asdict(self.config)
+        return self._config_dict
     
     def _shutdown_handler(self, signum, frame):
         """Handle shutdown signals"""
@@ -138,19 +219,30 @@ class AutoUpdateOrchestrator:
         
         logger.info("🚀 Starting Auto-Update Orchestrator")
         self.running = True
+        self._started_at_wall = time.time()
+        self._started_at_mono = time.monotonic()
+        # Live snapshots: the full history plus one in flight for the health monitor
+        # and one for the periodic check, which can now overlap on executor threads
+        self.health_pool.preallocate(self.health_history.maxlen + 2)
         
         # Initialize pattern engine
         self._initialize_pattern_engine()
         
-        # Start GitHub monitoring
-        self.github_monitor.start_monitoring()
+        # Validation runs on its own worker thread
+        self._cpu_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PatternValidation")
         
-        # Start worker threads
-        self._start_worker_threads()
+        # Keep the failure log open for the lifetime of the system
+        self._open_failure_log()
         
         # Schedule periodic tasks
         self._schedule_tasks()
         
+        # Start pipeline coroutines on a dedicated event loop thread
+        self._start_pipeline()
+        
+        # Start GitHub monitoring once the pipeline loop can receive its changes
+        self.github_monitor.start_monitoring()
+        
         logger.info("✅ Auto-Update system started successfully")
     
     def stop(self):
@@ -164,242 +256,355 @@ class AutoUpdateOrchestrator:
         # Stop GitHub monitoring
         self.github_monitor.stop_monitoring()
         
-        # Stop worker threads
-        for thread in self.threads:
-            if thread.is_alive():
-                thread.join(timeout=5)
+        # Cancel pipeline tasks; the loop exits once they have unwound
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._cancel_pipeline_tasks)
+        if self.loop_thread and self.loop_thread.is_alive():
+            self.loop_thread.join(timeout=5)
+        
+        self._close_failure_log()
+        
+        if self._cpu_pool:
+            self._cpu_pool.shutdown(wait=False)
+            self._cpu_pool = None
         
         logger.info("✅ Auto-Update system stopped")
     
     def _initialize_pattern_engine(self):
         """Initialize the optimized pattern engine"""
         try:
+            # The constructor builds (or reuses this process's) indexes; there is
+            # no separate initialize() step on the engine
             self.pattern_engine = OptimizedPatternEngine()
-            self.pattern_engine.initialize()
             logger.info("✅ Pattern engine initialized")
         except Exception as e:
             logger.error(f"❌ Failed to initialize pattern engine: {e}")
             raise
     
-    def _start_worker_threads(self):
-        """Start background worker threads"""
+    def _start_pipeline(self):
+        """Run the pipeline coroutines on a background event loop"""
         
-        # Change processing thread
-        change_thread = threading.Thread(
-            target=self._change_processor,
-            name="ChangeProcessor",
-            daemon=True
-        )
-        change_thread.start()
-        self.threads.append(change_thread)
-        
-        # Validation processing thread
-        validation_thread = threading.Thread(
-            target=self._validation_processor,
-            name="ValidationProcessor",
-            daemon=True
-        )
-        validation_thread.start()
-        self.threads.append(validation_thread)
-        
-        # Update processing thread
-        update_thread = threading.Thread(
-            target=self._update_processor,
-            name="UpdateProcessor",
-            daemon=True
-        )
-        update_thread.start()
-        self.threads.append(update_thread)
-        
-        # Health monitoring thread
-        health_thread = threading.Thread(
-            target=self._health_monitor,
-            name="HealthMonitor",
-            daemon=True
-        )
-        health_thread.start()
-        self.threads.append(health_thread)
+        # Created here rather than on the thread so changes can be handed over right away;
+        # the queues of a previous run are bound to its (closed) loop, so start fresh ones
+        self._create_queues()
+        self.loop = asyncio.new_event_loop()
         
-        logger.info(f"✅ Started {len(self.threads)} worker threads")
+        def run_async_loop():
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(self._run_pipeline())
+            finally:
+                self.loop.close()
+        
+        self.loop_thread = threading.Thread(target=run_async_loop, name="AutoUpdatePipeline", daemon=True)
+        self.loop_thread.start()
+    
+    async def _run_pipeline(self):
+        """Start every pipeline stage as a task and wait until they are cancelled"""
+        self.tasks = [
+            asyncio.create_task(self._change_processor(), name="ChangeProcessor"),
+            asyncio.create_task(self._validation_processor(), name="ValidationProcessor"),
+            asyncio.create_task(self._update_processor(), name="UpdateProcessor"),
+            asyncio.create_task(self._health_monitor(), name="HealthMonitor"),
+            asyncio.create_task(self._run_scheduler(), name="Scheduler"),
+        ]
+        logger.info(f"✅ Started {len(self.tasks)} pipeline tasks")
+        
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+    
+    def _cancel_pipeline_tasks(self):
+        """Cancel all pipeline tasks (runs on the pipeline loop)"""
+        for task in self.tasks:
+            task.cancel()
+    
+    def _on_change_detected(self, change: ChangeEvent):
+        """Receive a change from the GitHub monitor thread and wake the change processor"""
+        if self.running and self.loop:
+            self.loop.call_soon_threadsafe(self._enqueue_change, change)
+    
+    def _enqueue_change(self, change: ChangeEvent):
+        """Queue a detected change, discarding the oldest one if the queue is full"""
+        if self.change_queue.full():
+            dropped = self.change_queue.get_nowait()
+            logger.warning(f"⚠️ Change queue full, dropping oldest change from {dropped.source_name}")
+        self.change_queue.put_nowait(change)
+    
+    async def _run_blocking(self, func, *args):
+        """Run blocking I/O (validation, version control, file writes) off the loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def _run_cpu_bound(self, func, *args):
+        """Run CPU-bound work (pattern validation) on the dedicated validation executor"""
+        return await asyncio.get_running_loop().run_in_executor(self._cpu_pool, func, *args)
     
     def _schedule_tasks(self):
         """Schedule periodic tasks"""
+        self.scheduled_jobs = []
+        now = time.monotonic()
         
         # Health checks every 5 minutes
-        schedule.every(self.config.health_check_interval).seconds.do(self._periodic_health_check)
+        self._schedule_job(now + self.config.health_check_interval,
+                           self.config.health_check_interval, self._periodic_health_check)
         
         # Pattern refresh every hour
-        schedule.every(self.config.pattern_refresh_interval).seconds.do(self._periodic_pattern_refresh)
-        
-        # Cleanup old data daily
-        schedule.every().day.at("02:00").do(self._cleanup_old_data)
-        
-        # Start scheduler thread
-        scheduler_thread = threading.Thread(
-            target=self._run_scheduler,
-            name="Scheduler",
-            daemon=True
-        )
-        scheduler_thread.start()
-        self.threads.append(scheduler_thread)
-    
-    def _run_scheduler(self):
-        """Run the periodic task scheduler"""
-        while self.running:
-            schedule.run_pending()
-            time.sleep(1)
+        self._schedule_job(now + self.config.pattern_refresh_interval,
+                           self.config.pattern_refresh_interval, self._periodic_pattern_refresh)
+        
+        # Cleanup old data daily at 02:00
+        self._schedule_job(now + self._seconds_until(2, 0), 24 * 3600, self._cleanup_old_data)
+        
+        # Push buffered failure log lines to disk
+        self._schedule_job(now + self.FAILURE_LOG_FLUSH_INTERVAL,
+                           self.FAILURE_LOG_FLUSH_INTERVAL, self._flush_failure_log)
+    
+    def _schedule_job(self, deadline: float, interval: float, callback):
+        """Add a job to the timer heap (deadline on the time.monotonic clock)"""
+        heapq.heappush(self.scheduled_jobs, (deadline, next(self._job_sequence), interval, callback))
+    
+    @staticmethod
+    def _seconds_until(hour: int, minute: int) -> float:
+        """Seconds from now until the next local wall-clock hour:minute"""
+        now = datetime.now()
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return (target - now).total_seconds()
+    
+    async def _run_scheduler(self):
+        """Run the periodic task scheduler
+        
+        Sleeps exactly until the earliest deadline instead of polling every second.
+        """
+        while self.running and self.scheduled_jobs:
+            delay = self.scheduled_jobs[0][0] - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            
+            _, sequence, interval, callback = heapq.heappop(self.scheduled_jobs)
+            try:
+                # Jobs do file and version-control I/O; keep it off the pipeline loop
+                await self._run_blocking(callback)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Scheduled task {callback.__name__} failed: {e}")
+            
+            # Next run counts from completion, so a slow job never fires back-to-back
+            heapq.heappush(self.scheduled_jobs, (time.monotonic() + interval, sequence, interval, callback))
     
-    def _change_processor(self):
+    async def _change_processor(self):
         """Process changes detected by GitHub monitor"""
         logger.info("🔄 Change processor started")
         
         while self.running:
             try:
-                # Get pending changes from GitHub monitor
-                changes = self.github_monitor.get_pending_changes()
+                # Sleep until the monitor pushes a change, then take whatever else is waiting
+                changes = [await self.change_queue.get()]
+                while len(changes) < self.QUEUE_BATCH_SIZE and not self.change_queue.empty():
+                    changes.append(self.change_queue.get_nowait())
                 
+                accepted = []
                 for change in changes:
                     if self.config.emergency_stop:
                         logger.warning("🚨 Emergency stop activated, skipping changes")
                         continue
                     
                     logger.info(f"📝 Processing change from {change.source_name}")
-                    
-                    if self.config.validation_enabled:
-                        # Queue for validation
-                        self.validation_queue.put(change)
-                    else:
-                        # Skip validation, go directly to update
-                        self.update_queue.put((change, None))
+                    accepted.append(change)
                 
-                time.sleep(5)  # Check for changes every 5 seconds
+                if not accepted:
+                    continue
+                
+                # One queue put per block of changes instead of one per change
+                if self.config.validation_enabled:
+                    # Queue for validation
+                    await self.validation_queue.put(accepted)
+                else:
+                    # Skip validation, go directly to update
+                    await self.update_queue.put([(change, None) for change in accepted])
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"❌ Error in change processor: {e}")
-                time.sleep(10)
+                await asyncio.sleep(10)
     
-    def _validation_processor(self):
+    async def _validation_processor(self):
         """Process pattern validation"""
         logger.info("🧪 Validation processor started")
         
         while self.running:
             try:
-                change = self.validation_queue.get(timeout=5)
+                changes = await self.validation_queue.get()
                 
-                logger.info(f"🔍 Validating patterns from {change.source_name}")
-                
-                # Extract patterns from change
-                patterns_to_validate = self._extract_patterns_from_change(change)
+                # Extract patterns from every change in the batch, remembering
+                # which result keys belong to which change
+                patterns_to_validate = []
+                change_keys = []
+                for change in changes:
+                    logger.info(f"🔍 Validating patterns from {change.source_name}")
+                    
+                    patterns = self._extract_patterns_from_change(change)
+                    if not patterns:
+                        logger.warning("No patterns to validate")
+                        continue
+                    
+                    patterns_to_validate.extend(patterns)
+                    change_keys.append((change, [PatternValidator.result_key(pattern, source)
+                                                for pattern, source in patterns]))
                 
                 if not patterns_to_validate:
-                    logger.warning("No patterns to validate")
                     continue
                 
-                # Run comprehensive validation
-                validation_results = self.pattern_validator.validate_patterns_batch(patterns_to_validate)
+                # Run comprehensive validation once for the whole batch
+                batch_results = await self._run_cpu_bound(
+                    self.pattern_validator.validate_patterns_batch, patterns_to_validate
+                )
                 
-                # Check if validation passed
-                if self._validation_passed(validation_results):
-                    logger.info("✅ Validation passed, queuing for update")
-                    self.update_queue.put((change, validation_results))
-                else:
-                    logger.warning("❌ Validation failed, rejecting changes")
-                    self._handle_validation_failure(change, validation_results)
+                updates = []
+                for change, keys in change_keys:
+                    validation_results = {key: batch_results[key] for key in keys if key in batch_results}
+                    
+                    # Check if validation passed
+                    if self._validation_passed(validation_results):
+                        logger.info(f"✅ Validation passed for {change.source_name}, queuing for update")
+                        updates.append((change, validation_results))
+                    else:
+                        logger.warning(f"❌ Validation failed for {change.source_name}, rejecting changes")
+                        await self._run_blocking(self._handle_validation_failure, change, validation_results)
                 
-            except queue.Empty:
-                continue
+                if updates:
+                    await self.update_queue.put(updates)
+                
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"❌ Error in validation processor: {e}")
+                await asyncio.sleep(10)
     
-    def _update_processor(self):
+    async def _update_processor(self):
         """Process approved updates"""
         logger.info("🔄 Update processor started")
         
         while self.running:
             try:
-                change, validation_results = self.update_queue.get(timeout=5)
-                
-                logger.info(f"🚀 Applying update from {change.source_name}")
+                updates = await self.update_queue.get()
                 
-                # Create rollback point
-                rollback_point = self._create_rollback_point("before_update")
+                for change, validation_results in updates:
+                    await self._apply_update(change, validation_results)
                 
-                try:
-                    # Apply the update
-                    success = self._apply_pattern_update(change, validation_results)
-                    
-                    if success:
-                        logger.info("✅ Update applied successfully")
-                        self.last_update = time.time()
-                        self.rollback_count = 0  # Reset rollback count on success
-                    else:
-                        logger.error("❌ Update application failed")
-                        if self.config.auto_rollback:
-                            self._perform_rollback(rollback_point, "update_application_failed")
-                
-                except Exception as e:
-                    logger.error(f"❌ Error applying update: {e}")
-                    if self.config.auto_rollback:
-                        self._perform_rollback(rollback_point, f"update_error: {e}")
-                
-            except queue.Empty:
-                continue
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"❌ Error in update processor: {e}")
+                await asyncio.sleep(10)
     
-    def _health_monitor(self):
+    async def _apply_update(self, change: ChangeEvent, validation_results: Optional[Dict]):
+        """Apply one approved change behind a rollback point"""
+        logger.info(f"🚀 Applying update from {change.source_name}")
+        
+        # Create rollback point
+        rollback_point = await self._run_blocking(self._create_rollback_point, "before_update")
+        
+        try:
+            # Apply the update
+            success = await self._run_blocking(self._apply_pattern_update, change, validation_results)
+            
+            if success:
+                logger.info("✅ Update applied successfully")
+                self.last_update = time.time()
+                self.rollback_count = 0  # Reset rollback count on success
+            else:
+                logger.error("❌ Update application failed")
+                if self.config.auto_rollback:
+                    await self._run_blocking(self._perform_rollback, rollback_point,
+                                             "update_application_failed")
+        
+        except Exception as e:
+            logger.error(f"❌ Error applying update: {e}")
+            if self.config.auto_rollback:
+                await self._run_blocking(self._perform_rollback, rollback_point,
+                                         f"update_error: {e}")
+    
+    async def _health_monitor(self):
         """Monitor system health and trigger rollbacks if needed"""
         logger.info("🏥 Health monitor started")
         
         while self.running:
             try:
-                # Collect health metrics
-                health = self._collect_health_metrics()
-                self.health_history.append(health)
+                # Collect health metrics (the pattern count reads a snapshot from disk)
+                health = await self._run_blocking(self._collect_health_metrics)
                 
-                # Keep only recent history
-                if len(self.health_history) > 100:
-                    self.health_history = self.health_history[-100:]
+                # Keep only recent history: the bounded deque drops its oldest
+                # snapshot on append, so hand that one back to the pool first
+                if len(self.health_history) == self.health_history.maxlen:
+                    self.health_pool.release(self.health_history[0])
+                self.health_history.append(health)
                 
                 # Check for health issues
                 if health.status in ["degraded", "critical"]:
                     logger.warning(f"🚨 System health: {health.status}")
                     
                     if health.status == "critical" and self.config.auto_rollback:
-                        self._trigger_emergency_rollback(health)
+                        await self._run_blocking(self._trigger_emergency_rollback, health)
                 
-                time.sleep(self.config.health_check_interval)
+                await asyncio.sleep(self.config.health_check_interval)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"❌ Error in health monitor: {e}")
-                time.sleep(60)
+                await asyncio.sleep(60)
     
     def _extract_patterns_from_change(self, change: ChangeEvent) -> List[Tuple[str, str]]:
         """Extract patterns from a change event for validation"""
-        patterns = []
-        
-        if "added_lines" in change.changes:
-            for line in change.changes["added_lines"]:
-                if line.strip() and not line.startswith('!') and not line.startswith('#'):
-                    patterns.append((line.strip(), change.source_name))
+        source_name = change.source_name
+        
+        def candidate_patterns():
+            for line in change.added_lines:
+                pattern = line.strip()
+                if pattern and pattern[0] not in _COMMENT_PREFIXES:
+                    yield (pattern, source_name)
+        
+        # Limit to 20 patterns for validation, stopping as soon as they are found
+        return list(itertools.islice(candidate_patterns(), 20))
+    
+    @staticmethod
+    def _aggregate(validation_results: Dict) -> Tuple[float, int, int, int, float]:
+        """Walk validation results once, returning
+        (total_score, total_count, failed_count, patterns_all_passed, pattern_score_sum)"""
+        total_score = 0.0
+        total_count = 0
+        failed_count = 0
+        patterns_all_passed = 0
+        pattern_score_sum = 0.0
+        
+        for pattern_results in validation_results.values():
+            pattern_score = 0.0
+            pattern_failed = 0
+            for result in pattern_results.values():
+                pattern_score += result.score
+                if not result.passed:
+                    pattern_failed += 1
+            
+            stage_count = len(pattern_results)
+            total_score += pattern_score
+            total_count += stage_count
+            failed_count += pattern_failed
+            if not pattern_failed:
+                patterns_all_passed += 1
+            if stage_count:
+                pattern_score_sum += pattern_score / stage_count
         
-        return patterns[:20]  # Limit to 20 patterns for validation
+        return total_score, total_count, failed_count, patterns_all_passed, pattern_score_sum
     
     def _validation_passed(self, validation_results: Dict) -> bool:
         """Check if validation results indicate success"""
         if not validation_results:
             return False
         
-        total_score = 0
-        total_count = 0
-        failed_count = 0
-        
-        for pattern_key, pattern_results in validation_results.items():
-            for stage, result in pattern_results.items():
-                total_score += result.score
-                total_count += 1
-                if not result.passed:
-                    failed_count += 1
+        total_score, total_count, failed_count, _, _ = self._aggregate(validation_results)
         
         if total_count == 0:
             return False
@@ -418,16 +623,31 @@ class AutoUpdateOrchestrator:
         failure_details = {
             "source": change.source_name,
             "timestamp": time.time(),
-            "change": asdict(change),
+            "change": change,  # orjson serializes the dataclass directly
             "validation_summary": self._summarize_validation_results(validation_results)
         }
         
-        # Save failure log
-        failure_log_file = self.base_path / "autoupdate" / "validation_failures.jsonl"
-        failure_log_file.parent.mkdir(exist_ok=True)
-        
-        with open(failure_log_file, 'a') as f:
-            f.write(json.dumps(failure_details) + '\n')
+        # Append to the buffered failure log; the scheduler flushes it periodically
+        if self._failure_log is None:
+            self._open_failure_log()
+        self._failure_log.write(orjson.dumps(failure_details, option=orjson.OPT_APPEND_NEWLINE))
+    
+    def _open_failure_log(self):
+        """Open the validation failure log once for buffered appends"""
+        if self._failure_log is None:
+            self.failure_log_file.parent.mkdir(exist_ok=True)
+            self._failure_log = open(self.failure_log_file, 'ab', buffering=self.FAILURE_LOG_BUFFER_SIZE)
+    
+    def _flush_failure_log(self):
+        """Flush buffered failure log lines to disk"""
+        if self._failure_log is not None:
+            self._failure_log.flush()
+    
+    def _close_failure_log(self):
+        """Flush and close the failure log"""
+        if self._failure_log is not None:
+            self._failure_log.close()
+            self._failure_log = None
     
     def _summarize_validation_results(self, validation_results: Dict) -> Dict:
         """Create summary of validation results"""
@@ -435,8 +655,8 @@ class AutoUpdateOrchestrator:
             return {"error": "no_results"}
         
         total_patterns = len(validation_results)
-        passed_patterns = sum(1 for pr in validation_results.values() if all(r.passed for r in pr.values()))
-        avg_score = sum(sum(r.score for r in pr.values()) / len(pr) for pr in validation_results.values()) / total_patterns
+        _, _, _, passed_patterns, pattern_score_sum = self._aggregate(validation_results)
+        avg_score = pattern_score_sum / total_patterns
         
         return {
             "total_patterns": total_patterns,
@@ -478,7 +698,7 @@ class AutoUpdateOrchestrator:
             # 3. Invalidate caches
             # 4. Verify the update worked
             
-            logger.info(f"📦 Applying {change.changes.get('added_patterns', 0)} new patterns")
+            logger.info(f"📦 Applying {change.added_patterns} new patterns")
             
             # Simulate pattern update
             if self.pattern_engine:
@@ -490,7 +710,7 @@ class AutoUpdateOrchestrator:
             new_patterns = self._simulate_new_patterns(change)
             commit_id = self.version_control.commit_changes(
                 new_patterns,
-                f"Auto-update from {change.source_name}: {change.changes.get('added_patterns', 0)} patterns",
+                f"Auto-update from {change.source_name}: {change.added_patterns} patterns",
                 "auto-update-system",
                 validation_results
             )
@@ -516,6 +736,7 @@ class AutoUpdateOrchestrator:
         if self.rollback_count >= self.config.max_rollback_attempts:
             logger.critical("🚨 Max rollback attempts reached, enabling emergency stop")
             self.config.emergency_stop = True
+            self._config_dict = None
             return
         
         logger.warning(f"🔄 Performing rollback: {reason}")
@@ -536,16 +757,16 @@ class AutoUpdateOrchestrator:
     def _collect_health_metrics(self) -> SystemHealth:
         """Collect current system health metrics"""
         # In a real implementation, would collect actual metrics
-        health = SystemHealth(
-            timestamp=time.time(),
-            detection_speed_ms=25.0,  # Simulated
-            memory_usage_mb=150.0,    # Simulated
-            pattern_count=self._get_total_pattern_count(),
-            false_positive_rate=0.0001,  # Simulated
-            cache_hit_rate=0.75,      # Simulated
-            errors_per_hour=0,        # Simulated
-            status="healthy"
-        )
+        # Reuse a pooled snapshot, refilling every field in place
+        health = self.health_pool.acquire()
+        health.timestamp = time.time()
+        health.detection_speed_ms = 25.0  # Simulated
+        health.memory_usage_mb = 150.0    # Simulated
+        health.pattern_count = self._get_total_pattern_count()
+        health.false_positive_rate = 0.0001  # Simulated
+        health.cache_hit_rate = 0.75      # Simulated
+        health.errors_per_hour = 0        # Simulated
+        health.status = "healthy"
         
         # Determine status based on metrics
         if health.detection_speed_ms > 100 or health.false_positive_rate > 0.01:
@@ -584,6 +805,9 @@ class AutoUpdateOrchestrator:
         logger.info(f"   Memory Usage: {health.memory_usage_mb:.1f}MB")
         logger.info(f"   Pattern Count: {health.pattern_count}")
         logger.info(f"   Cache Hit Rate: {health.cache_hit_rate:.1%}")
+        
+        # This snapshot is not kept in the history
+        self.health_pool.release(health)
     
     def _periodic_pattern_refresh(self):
         """Periodic pattern refresh from sources"""
@@ -614,13 +838,18 @@ class AutoUpdateOrchestrator:
         
         return {
             "running": self.running,
-            "config": asdict(self.config),
+            "config": self._get_config_dict(),
             "last_update": self.last_update,
+            "started_at": self._started_at_wall,
+            "uptime_seconds": (time.monotonic() - self._started_at_mono) if self._started_at_mono else 0.0,
             "rollback_count": self.rollback_count,
             "github_monitor": self.github_monitor.get_monitoring_status(),
             "pattern_count": self._get_total_pattern_count(),
-            "recent_health": asdict(recent_health) if recent_health else None,
+            "recent_health": ({name: getattr(recent_health, name) for name in _SYSTEM_HEALTH_FIELDS}
+                              if recent_health else None),
+            # asyncio.Queue.qsize() is a plain len() of its deque: no lock to contend on
             "queue_sizes": {
+                "changes": self.change_queue.qsize(),
                 "validation": self.validation_queue.qsize(),
                 "update": self.update_queue.qsize()
             }
@@ -641,15 +870,19 @@ def main():
         print("📊 Monitor status with: http://localhost:8080/status")
         print("Press Ctrl+C to stop")
         
+        # Print status once a minute, sleeping until it is due instead of waking every second
+        status_interval = 60
+        next_status = time.monotonic() + status_interval
         while orchestrator.running:
-            time.sleep(1)
+            time.sleep(max(0.0, next_status - time.monotonic()))
+            if not orchestrator.running:
+                break
             
-            # Print periodic status
-            if int(time.time()) % 60 == 0:  # Every minute
-                status = orchestrator.get_system_status()
-                print(f"📊 Status: Patterns: {status['pattern_count']}, "
-                      f"Queues: V={status['queue_sizes']['validation']} "
-                      f"U={status['queue_sizes']['update']}")
+            status = orchestrator.get_system_status()
+            print(f"📊 Status: Patterns: {status['pattern_count']}, "
+                  f"Queues: V={status['queue_sizes']['validation']} "
+                  f"U={status['queue_sizes']['update']}")
+            next_status += status_interval
     
     except KeyboardInterrupt:
         print("\n⏹️ Shutting down...")
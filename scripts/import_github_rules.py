@@ -27,6 +27,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Leading characters of adblock comment lines, shared with the auto-update orchestrator.
+# Checked with one indexed lookup on the stripped line, which measured several times
+# faster than a compiled ^[!#] regex
+_COMMENT_PREFIXES = '!#'
+
+# Rule-parsing regexes, compiled once at import instead of looked up in re's
+# internal cache for every pattern of every rule. Each is paired with a literal
+# every match contains, so a plain substring check skips regexes that cannot match
+_DOMAIN_RULE_PATTERNS = tuple((literal, re.compile(pattern)) for literal, pattern in (
+    ('||', r'\|\|([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\^'),  # ||domain.com^
+    ('||', r'\|\|([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'),    # ||domain.com
+    ('://', r'://([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})/'),    # ://domain.com/
+    ('/', r'\.([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\/'),      # .domain.com/
+    ('^', r'([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\^'),        # domain.com^
+))
+
+# Tracking file keywords, longest first so no keyword masks a longer one
+_URL_RULE_FILE_KEYWORDS = '|'.join(sorted(
+    map(re.escape, ('pixel', 'analytics', 'beacon', 'collect')), key=len, reverse=True
+))
+
+_URL_RULE_PATTERNS = tuple((literal, re.compile(pattern)) for literal, pattern in (
+    # /tracking.js, /pixel.gif, /analytics.js, /beacon.gif, /collect.js in one scan
+    # ('track' needs a prefix, as in the original per-keyword rule)
+    ('/', rf'/((?:[a-zA-Z0-9_-]+track|[a-zA-Z0-9_-]*(?:{_URL_RULE_FILE_KEYWORDS}))[a-zA-Z0-9_-]*\.[a-zA-Z]{{2,4}})'),
+    ('/open?', r'/(open\?[^$]+)'),  # Email open tracking
+    ('/imp?', r'/(imp\?[^$]+)'),    # Impression tracking
+    ('/hit?', r'/(hit\?[^$]+)'),    # Hit tracking
+))
+
+_VALID_DOMAIN_RE = re.compile(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# CSS rule keyword sets as single alternations: one scan per rule instead of one per keyword
+_CSS_RULE_KEYWORDS_RE = re.compile('css|style|background|image')
+_CSS_RULE_TERMS_RE = re.compile(r'background|url\(|image')
+
 class GitHubRulesImporter:
     """Imports open source tracking protection rules from GitHub repositories"""
     
@@ -141,20 +177,14 @@ class GitHubRulesImporter:
         domains = set()
         
         for rule in rules:
-            if not rule or rule.startswith('!') or rule.startswith('#'):
+            if not rule or rule[0] in _COMMENT_PREFIXES:
                 continue
                 
             # Extract domains from different rule formats
-            domain_patterns = [
-                r'\|\|([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\^',  # ||domain.com^
-                r'\|\|([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',    # ||domain.com
-                r'://([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})/',    # ://domain.com/
-                r'\.([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\/',    # .domain.com/
-                r'([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\^',      # domain.com^
-            ]
-            
-            for pattern in domain_patterns:
-                matches = re.findall(pattern, rule)
+            for literal, pattern in _DOMAIN_RULE_PATTERNS:
+                if literal not in rule:
+                    continue
+                matches = pattern.findall(rule)
                 for match in matches:
                     domain = match.lower().strip('.')
                     if self._is_valid_domain(domain):
@@ -167,23 +197,14 @@ class GitHubRulesImporter:
         patterns = set()
         
         for rule in rules:
-            if not rule or rule.startswith('!') or rule.startswith('#'):
+            if not rule or rule[0] in _COMMENT_PREFIXES:
                 continue
             
             # Extract various tracking URL patterns
-            url_patterns = [
-                r'/([a-zA-Z0-9_-]+track[a-zA-Z0-9_-]*\.[a-zA-Z]{2,4})',      # /track.gif, /tracking.js
-                r'/([a-zA-Z0-9_-]*pixel[a-zA-Z0-9_-]*\.[a-zA-Z]{2,4})',      # /pixel.gif, /tracking-pixel.png
-                r'/([a-zA-Z0-9_-]*analytics[a-zA-Z0-9_-]*\.[a-zA-Z]{2,4})',  # /analytics.js
-                r'/([a-zA-Z0-9_-]*beacon[a-zA-Z0-9_-]*\.[a-zA-Z]{2,4})',     # /beacon.gif
-                r'/([a-zA-Z0-9_-]*collect[a-zA-Z0-9_-]*\.[a-zA-Z]{2,4})',    # /collect.js
-                r'/(open\?[^$]+)',  # Email open tracking
-                r'/(imp\?[^$]+)',   # Impression tracking
-                r'/(hit\?[^$]+)',   # Hit tracking
-            ]
-            
-            for pattern in url_patterns:
-                matches = re.findall(pattern, rule)
+            for literal, pattern in _URL_RULE_PATTERNS:
+                if literal not in rule:
+                    continue
+                matches = pattern.findall(rule)
                 for match in matches:
                     if len(match) > 3:  # Avoid too short patterns
                         patterns.add(match.lower())
@@ -199,13 +220,13 @@ class GitHubRulesImporter:
                 continue
             
             # Look for CSS-related tracking rules
-            if any(keyword in rule.lower() for keyword in ['css', 'style', 'background', 'image']):
+            if _CSS_RULE_KEYWORDS_RE.search(rule.lower()):
                 # Extract pattern
                 if '##' in rule:  # CSS selector
-                    selector = rule.split('##')[1] if '##' in rule else ''
+                    selector = rule.split('##', 2)[1]
                     if selector and len(selector) > 3:
                         css_patterns.add(selector)
-                elif any(term in rule for term in ['background', 'url(', 'image']):
+                elif _CSS_RULE_TERMS_RE.search(rule):
                     css_patterns.add(rule.strip())
         
         return css_patterns
@@ -216,7 +237,7 @@ class GitHubRulesImporter:
             return False
         
         # Basic domain validation
-        if not re.match(r'^[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', domain):
+        if not _VALID_DOMAIN_RE.match(domain):
             return False
         
         # Exclude invalid patterns
@@ -5,31 +5,160 @@ Optimized Pattern Matching Engine
 High-performance tracking detection with:
 - O(1) domain lookups using hash maps
 - Intelligent pattern caching
-- Parallel processing for batch analysis
+- Single-pass batch analysis
 - Memory-efficient indexing
 
 Replaces O(n) regex scanning with optimized data structures.
 """
 
-import json
+import functools
+import mmap
+import os
+import pickle
+import tempfile
 import re
 import time
 import threading
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import hashlib
+import orjson
+
+# Attribute values mentioning any extraction keyword, as one alternation so the
+# email is scanned once instead of once per keyword
+_EXTRACTION_PATTERN = r'(?:src|href)=[\"\']([^\"\']*(?:href|background|url)[^\"\']*)'
+
+# <img> src extraction. The attribute run before src= is bounded and the tag close
+# is not required: an unbounded [^>]* followed by [^>]*> backtracks cubically on
+# malformed HTML with many unclosed <img tags
+_IMG_PATTERN = r'<img[^>]{0,2048}src=[\"\']([^\"\']+)[\"\']'
+
+# Regex cache keys used by URL extraction, hashed once at import instead of per email
+_IMG_PATTERN_KEY = hashlib.md5(_IMG_PATTERN.encode()).hexdigest()
+_EXTRACTION_PATTERN_KEY = hashlib.md5(_EXTRACTION_PATTERN.encode()).hexdigest()
+
+# Indexed threat levels that flag a URL as malicious
+_MALICIOUS_THREAT_LEVELS = frozenset(('critical', 'high'))
+
+# Runs of '*' in MailTracker wildcard patterns
+_WILDCARD_RUN_RE = re.compile(r'\*+')
+
+# Second-level labels under country TLDs that are registries, not registrants (co.uk, com.au)
+_COUNTRY_SECOND_LEVELS = frozenset((
+    'ac', 'co', 'com', 'edu', 'go', 'gob', 'gov', 'ltd', 'ne', 'net', 'or', 'org', 'plc',
+))
+
+# Shared hosting and CDN parents whose subdomains belong to unrelated tenants
+_SHARED_HOST_SUFFIXES = frozenset((
+    'amazonaws.com', 's3.amazonaws.com', 'elasticbeanstalk.com', 'cloudfront.net',
+    'googleapis.com', 'storage.googleapis.com', 'googleusercontent.com', 'appspot.com',
+    'firebaseapp.com', 'web.app', 'herokuapp.com', 'fastly.net', 'global.ssl.fastly.net',
+    'akamaihd.net', 'akamaized.net', 'akamai.net', 'edgekey.net', 'edgesuite.net',
+    'azureedge.net', 'azurewebsites.net', 'cloudapp.net', 'blob.core.windows.net',
+    'b-cdn.net', 'github.io', 'githubusercontent.com', 'gitlab.io', 'netlify.app',
+    'vercel.app', 'pages.dev', 'workers.dev', 'blogspot.com', 'wordpress.com',
+    'myshopify.com', 'wixsite.com', 'digitaloceanspaces.com', 'ngrok.io',
+))
+
+def _is_public_suffix(host: str) -> bool:
+    """Whether a parent host is shared by unrelated registrants (co.uk, herokuapp.com)."""
+    if host in _SHARED_HOST_SUFFIXES:
+        return True
+    label, _, country = host.partition('.')
+    return len(country) == 2 and label in _COUNTRY_SECOND_LEVELS
+
+# Parsed source files shared by every engine in the process: path -> (mtime, data)
+_SOURCE_CACHE: Dict[str, Tuple[float, Dict]] = {}
+
+def _load_json_source(path: Path) -> Dict:
+    """Memory-map and parse a JSON source file once per process (until it changes)."""
+    key = str(path)
+    mtime = path.stat().st_mtime
+    
+    cached = _SOURCE_CACHE.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    
+    with open(path, 'rb') as f:
+        if path.stat().st_size == 0:
+            data = {}
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    data = orjson.loads(view)
+                finally:
+                    view.release()
+    
+    _SOURCE_CACHE[key] = (mtime, data)
+    return data
+
+# Frequently used regexes, compiled for every engine
+_COMMON_PATTERNS = (
+    # Tracking keywords share one alternation: one compile and one scan, not five
+    r'(?:src|href)=[\"\']([^\"\']*(?:track|pixel|analytics|beacon|collect)[^\"\']*)',
+    _IMG_PATTERN,
+    _EXTRACTION_PATTERN,
+    r'width=["\']?1["\']?[^>]*height=["\']?1["\']?',
+    r'height=["\']?1["\']?[^>]*width=["\']?1["\']?',
+    r'style=["\'][^"\']*display:\s*none[^"\']*["\']',
+    r'style=["\'][^"\']*width:\s*1px[^"\']*["\']'
+)
+
+@functools.lru_cache(maxsize=1)
+def _compile_common_patterns() -> Dict[str, re.Pattern]:
+    """Hash and compile _COMMON_PATTERNS once per process (pattern_hash -> regex).
+    
+    Engines copy the result into their own regex_pattern_cache, so the shared
+    mapping is never mutated.
+    """
+    compiled_patterns = {}
+    for pattern in _COMMON_PATTERNS:
+        pattern_hash = hashlib.md5(pattern.encode()).hexdigest()
+        try:
+            compiled_patterns[pattern_hash] = re.compile(pattern, re.IGNORECASE)
+        except re.error:
+            continue
+    return compiled_patterns
+
+# Indexes built (or restored) by the first engine in the process, shared read-only
+# with every later engine while the source manifest still matches
+_PROCESS_INDEXES: Optional[Dict] = None
+
+@dataclass(slots=True)
+class DomainThreat:
+    """Threat intel for one indexed domain (one per domain, so kept slotted)."""
+    threat_level: str
+    source: str
+    confidence: str
+    patterns: List[Dict] = field(default_factory=list)
 
 class OptimizedPatternEngine:
     """High-performance pattern matching engine with O(1) domain lookups."""
     
+    # Bump when the layout of the indexes changes to invalidate old warm state
+    WARM_STATE_VERSION = 9
+    
+    # URLs whose analysis is remembered across batches (trackers recur across emails)
+    URL_CACHE_SIZE = 4096
+    
     def __init__(self):
         self.base_path = Path(__file__).parent.parent
+        self.cache_dir = self.base_path / "cache"
+        self.warm_state_file = self.cache_dir / "engine_warm_state.pkl"
+        self.source_files = [
+            self.cache_dir / "mailtracker_cache.json",
+            self.base_path / "sources" / "github_tracking_rules.json"
+        ]
         
         # High-performance indexes
-        self.domain_index = {}  # domain -> threat_info
-        self.url_pattern_index = defaultdict(list)  # domain -> [url_patterns]
+        self.domain_index = {}  # domain -> DomainThreat
+        self.url_pattern_domains = set()  # domains whose URLs are checked against the matcher
+        self.url_pattern_matcher = None  # all GitHub URL patterns as one literal trie
+        self.mailtracker_patterns = []  # MailTracker wildcard patterns, in alternation order
+        self.mailtracker_regexes = []  # each MailTracker pattern compiled on its own
+        self.mailtracker_matcher = None  # all MailTracker patterns as one alternation
         self.regex_pattern_cache = {}  # pattern_hash -> compiled_regex
         
         # Statistics
@@ -42,9 +171,12 @@ class OptimizedPatternEngine:
         }
         
         # Threading
-        self.max_workers = 4
         self._lock = threading.Lock()
         
+        # Per-engine memo of URL -> analysis result; the indexes it reads never
+        # change after initialization, so entries stay valid for the engine's lifetime
+        self._cached_url_analysis = functools.lru_cache(maxsize=self.URL_CACHE_SIZE)(self._analyze_single_url)
+        
         # Load and index patterns
         self._initialize_indexes()
     
@@ -53,11 +185,14 @@ class OptimizedPatternEngine:
         print("[+] 🚀 Inițializez motor optimizat de pattern-uri...")
         start_time = time.time()
         
-        # 1. Index MailTracker patterns
-        self._index_mailtracker_patterns()
-        
-        # 2. Index GitHub patterns  
-        self._index_github_patterns()
+        # 1-2. Reuse this process's indexes, restore them from warm state,
+        # or index MailTracker + GitHub patterns
+        if not self._load_process_indexes():
+            if not self._load_warm_state():
+                self._index_mailtracker_patterns()
+                self._index_github_patterns()
+                self._save_warm_state()
+            self._store_process_indexes()
         
         # 3. Pre-compile frequently used regex patterns
         self._precompile_common_patterns()
@@ -69,45 +204,178 @@ class OptimizedPatternEngine:
         print(f"    🎯 Pattern-uri cached: {self.stats['patterns_cached']:,}")
         print(f"    ⚡ Timp inițializare: {load_time:.3f}s")
     
+    def _get_source_manifest(self) -> Dict:
+        """Snapshot source file mtimes used to validate the warm state."""
+        return {
+            'version': self.WARM_STATE_VERSION,
+            'sources': {
+                str(path): path.stat().st_mtime if path.exists() else None
+                for path in self.source_files
+            }
+        }
+    
+    def _export_indexes(self) -> Dict:
+        """Built indexes, with the manifest of the sources they were built from."""
+        return {
+            'manifest': self._get_source_manifest(),
+            'domain_index': self.domain_index,
+            'url_pattern_domains': self.url_pattern_domains,
+            'url_pattern_matcher': self.url_pattern_matcher,
+            'mailtracker_patterns': self.mailtracker_patterns,
+            'mailtracker_regexes': self.mailtracker_regexes,
+            'mailtracker_matcher': self.mailtracker_matcher,
+            'domains_indexed': self.stats['domains_indexed']
+        }
+    
+    def _apply_indexes(self, state: Dict):
+        """Adopt indexes exported by _export_indexes()."""
+        self.domain_index = state['domain_index']
+        self.url_pattern_domains = state['url_pattern_domains']
+        self.url_pattern_matcher = state['url_pattern_matcher']
+        self.mailtracker_patterns = state['mailtracker_patterns']
+        self.mailtracker_regexes = state['mailtracker_regexes']
+        self.mailtracker_matcher = state['mailtracker_matcher']
+        self.stats['domains_indexed'] = state['domains_indexed']
+    
+    def _load_process_indexes(self) -> bool:
+        """Reuse indexes another engine in this process already built."""
+        if _PROCESS_INDEXES is None or _PROCESS_INDEXES['manifest'] != self._get_source_manifest():
+            return False
+        
+        self._apply_indexes(_PROCESS_INDEXES)
+        print(f"    [✓] Indexuri din proces: {len(self.domain_index)} domenii refolosite")
+        return True
+    
+    def _store_process_indexes(self):
+        """Share this engine's indexes with engines created later in the process."""
+        global _PROCESS_INDEXES
+        _PROCESS_INDEXES = self._export_indexes()
+    
+    def _load_warm_state(self) -> bool:
+        """Load pickled indexes if no source file changed since they were built."""
+        if not self.warm_state_file.exists():
+            return False
+        
+        try:
+            with open(self.warm_state_file, 'rb') as f:
+                warm_state = pickle.load(f)
+            
+            if warm_state.get('manifest') != self._get_source_manifest():
+                return False
+            
+            self._apply_indexes(warm_state)
+            
+            print(f"    [✓] Warm state: {len(self.domain_index)} domenii încărcate din cache")
+            return True
+            
+        except Exception as e:
+            print(f"    [-] Eroare încărcare warm state: {e}")
+            return False
+    
+    def _save_warm_state(self):
+        """Persist built indexes so the next process skips JSON parsing."""
+        warm_state = self._export_indexes()
+        
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            # Write a temp file and rename it over the old state, so a process
+            # starting concurrently never reads a half-written pickle
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=self.warm_state_file.name,
+                                            suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(warm_state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.warm_state_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            print(f"    [-] Eroare salvare warm state: {e}")
+    
     def _index_mailtracker_patterns(self):
         """Index MailTracker patterns for O(1) domain lookups."""
-        cache_file = self.base_path / "cache" / "mailtracker_cache.json"
+        cache_file = self.cache_dir / "mailtracker_cache.json"
         if not cache_file.exists():
             return
         
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            cache_data = _load_json_source(cache_file)
             
+            mailtracker_domains = set()
             for item in cache_data.get('data', []):
                 pattern = item.get('pattern', '')
                 domain = item.get('domain', '')
                 
                 if domain and pattern:
-                    # Extract base domain for indexing
-                    base_domain = self._extract_base_domain(domain)
-                    
-                    if base_domain not in self.domain_index:
-                        self.domain_index[base_domain] = {
-                            'threat_level': 'critical',
-                            'source': 'MailTracker',
-                            'patterns': [],
-                            'confidence': 'high'
-                        }
+                    # Index both the declared domain and the host the pattern targets
+                    hosts = {self._extract_base_domain(domain)}
+                    pattern_host = self._extract_pattern_host(pattern)
+                    if pattern_host:
+                        hosts.add(pattern_host)
                     
-                    self.domain_index[base_domain]['patterns'].append({
+                    pattern_info = {
                         'pattern': pattern,
                         'regex_pattern': item.get('regex_pattern', ''),
                         'confidence': item.get('confidence', 'high')
-                    })
+                    }
+                    
+                    for base_domain in hosts:
+                        if base_domain not in self.domain_index:
+                            self.domain_index[base_domain] = DomainThreat(
+                                threat_level='critical',
+                                source='MailTracker',
+                                confidence='high'
+                            )
+                            mailtracker_domains.add(base_domain)
+                        
+                        self.domain_index[base_domain].patterns.append(pattern_info)
                     
                     self.stats['domains_indexed'] += 1
+                    self.mailtracker_patterns.append(pattern)
+            
+            if self.mailtracker_patterns:
+                self._compile_mailtracker_matchers()
             
-            print(f"    [✓] MailTracker: {len([d for d in self.domain_index if self.domain_index[d]['source'] == 'MailTracker'])} domenii indexate")
+            print(f"    [✓] MailTracker: {len(mailtracker_domains)} domenii indexate")
             
         except Exception as e:
             print(f"    [-] Eroare indexare MailTracker: {e}")
     
+    def _compile_mailtracker_matchers(self):
+        """Compile the MailTracker patterns one by one and as a single union."""
+        # Union every wildcard pattern into one group-free regex compiled once.
+        # A group per pattern made re save every group's marks on each branch
+        # attempt, so one search cost O(patterns^2); the matching pattern is
+        # instead found from the per-pattern regexes, only on a hit
+        glob_regexes = [self._glob_to_regex(pattern) for pattern in self.mailtracker_patterns]
+        self.mailtracker_regexes = [re.compile(regex, re.IGNORECASE) for regex in glob_regexes]
+        self.mailtracker_matcher = re.compile(
+            '|'.join(f'(?:{regex})' for regex in glob_regexes), re.IGNORECASE
+        )
+    
+    def _extract_pattern_host(self, pattern: str) -> str:
+        """Extract the concrete host from a wildcard pattern (*://*.host.com/path -> host.com)."""
+        host = self._extract_base_domain(pattern).split('?', 1)[0].split(':', 1)[0]
+        host = host.lstrip('*.')
+        
+        # Hosts that are still wildcarded can't be indexed by exact lookup
+        if '*' in host or '.' not in host:
+            return ''
+        return host
+    
+    def _glob_to_regex(self, pattern: str) -> str:
+        """Convert a MailTracker wildcard pattern (*://host/path?*) to regex source."""
+        # Collapse '**' runs and drop edge wildcards: search() is unanchored, so a
+        # leading/trailing '.*' adds nothing but quadratic backtracking on long URLs
+        pattern = _WILDCARD_RUN_RE.sub('*', pattern).strip('*')
+        
+        # Each '*' becomes an atomic lazy skip to the next literal segment. Taking
+        # the earliest occurrence of every segment matches whenever any split does,
+        # so committing to it loses no match while keeping the scan from one start
+        # linear: greedy '.*' runs backtrack polynomially in the number of stars
+        first, *rest = re.escape(pattern).split(r'\*')
+        return first + ''.join(f'(?>.*?{segment})' for segment in rest)
+    
     def _index_github_patterns(self):
         """Index GitHub patterns for fast domain-based lookups."""
         github_file = self.base_path / "sources" / "github_tracking_rules.json"
@@ -115,8 +383,11 @@ class OptimizedPatternEngine:
             return
         
         try:
-            with open(github_file, 'r', encoding='utf-8') as f:
-                github_data = json.load(f)
+            github_data = _load_json_source(github_file)
+            
+            # Compile all URL patterns once into a single automaton shared by every domain
+            url_patterns = [p for p in github_data.get('url_patterns', []) if len(p) > 5]
+            self.url_pattern_matcher = self._compile_literal_matcher(url_patterns)
             
             # Index domains from GitHub
             github_domains = 0
@@ -125,24 +396,52 @@ class OptimizedPatternEngine:
                     base_domain = self._extract_base_domain(domain)
                     
                     if base_domain not in self.domain_index:
-                        self.domain_index[base_domain] = {
-                            'threat_level': 'medium',
-                            'source': 'GitHub',
-                            'patterns': [],
-                            'confidence': 'medium'
-                        }
+                        self.domain_index[base_domain] = DomainThreat(
+                            threat_level='medium',
+                            source='GitHub',
+                            confidence='medium'
+                        )
                         github_domains += 1
                     
-                    # Add URL patterns for this domain
-                    for url_pattern in github_data.get('url_patterns', []):
-                        if len(url_pattern) > 5:
-                            self.url_pattern_index[base_domain].append(url_pattern)
+                    # Every GitHub domain shares the one matcher, so keep a plain
+                    # domain set rather than a per-domain map to the same object
+                    if self.url_pattern_matcher is not None:
+                        self.url_pattern_domains.add(base_domain)
             
             print(f"    [✓] GitHub: {github_domains} domenii noi indexate")
             
         except Exception as e:
             print(f"    [-] Eroare indexare GitHub: {e}")
     
+    def _compile_literal_matcher(self, literals: List[str]) -> Optional[re.Pattern]:
+        """Compile literal substrings into a prefix-trie regex matched in a single pass."""
+        unique_literals = {literal.lower() for literal in literals if literal}
+        if not unique_literals:
+            return None
+        
+        trie = {}
+        for literal in unique_literals:
+            node = trie
+            for char in literal:
+                node = node.setdefault(char, {})
+            node[''] = {}  # end-of-literal marker
+        
+        return re.compile(self._trie_to_pattern(trie))
+    
+    def _trie_to_pattern(self, node: Dict) -> str:
+        """Render a literal trie as a regex that tries one branch per character."""
+        branches = [re.escape(char) + self._trie_to_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        
+        # Greedy optional group prefers the longest literal sharing this prefix
+        if '' in node:
+            return '(?:' + '|'.join(branches) + ')?'
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+    
     def _extract_base_domain(self, domain: str) -> str:
         """Extract base domain for indexing (www.example.com -> example.com)."""
         domain = domain.lower().strip()
@@ -163,138 +462,185 @@ class OptimizedPatternEngine:
     
     def _precompile_common_patterns(self):
         """Pre-compile frequently used regex patterns for performance."""
-        common_patterns = [
-            r'(?:src|href)=[\"\']([^\"\']*track[^\"\']*)',
-            r'(?:src|href)=[\"\']([^\"\']*pixel[^\"\']*)',
-            r'(?:src|href)=[\"\']([^\"\']*analytics[^\"\']*)',
-            r'(?:src|href)=[\"\']([^\"\']*beacon[^\"\']*)',
-            r'(?:src|href)=[\"\']([^\"\']*collect[^\"\']*)',
-            r'<img[^>]*src=[\"\']([^\"\']+)[\"\'][^>]*>',
-            r'width=["\']?1["\']?[^>]*height=["\']?1["\']?',
-            r'height=["\']?1["\']?[^>]*width=["\']?1["\']?',
-            r'style=["\'][^"\']*display:\s*none[^"\']*["\']',
-            r'style=["\'][^"\']*width:\s*1px[^"\']*["\']'
-        ]
-        
-        for pattern in common_patterns:
-            pattern_hash = hashlib.md5(pattern.encode()).hexdigest()
-            try:
-                self.regex_pattern_cache[pattern_hash] = re.compile(pattern, re.IGNORECASE)
-                self.stats['patterns_cached'] += 1
-            except re.error:
-                continue
+        compiled_patterns = _compile_common_patterns()
+        self.regex_pattern_cache.update(compiled_patterns)
+        self.stats['patterns_cached'] += len(compiled_patterns)
         
         print(f"    [✓] Pre-compiled: {len(self.regex_pattern_cache)} regex patterns")
     
     def fast_domain_lookup(self, url: str) -> Optional[Dict]:
         """O(1) domain threat lookup."""
-        self.stats['total_lookups'] += 1
+        indexed_domain = self._lookup_indexed_domain(url)
+        if not indexed_domain:
+            return None
         
-        # Extract domain from URL
-        domain = self._extract_domain_from_url(url)
+        return asdict(self.domain_index[indexed_domain])
+    
+    def _lookup_indexed_domain(self, url: str) -> Optional[str]:
+        """Resolve a URL host to its indexed domain, walking up parent labels."""
+        return self._lookup_host(self._extract_domain_from_url(url))
+    
+    def _lookup_host(self, domain: str) -> Optional[str]:
+        """Resolve an already-extracted URL host to its indexed domain."""
+        self.stats['total_lookups'] += 1
         if not domain:
             return None
         
-        base_domain = self._extract_base_domain(domain)
+        candidate = self._extract_base_domain(domain)
         
-        # O(1) hash table lookup
-        if base_domain in self.domain_index:
-            self.stats['cache_hits'] += 1
-            return self.domain_index[base_domain]
+        # O(1) hash table lookup per label suffix (a.b.example.com -> b.example.com -> example.com).
+        # The walk stops at the registrable domain: an index entry for a public or
+        # multi-tenant suffix (com.au, herokuapp.com) says nothing about its subdomains
+        while True:
+            if candidate in self.domain_index:
+                self.stats['cache_hits'] += 1
+                return candidate
+            
+            dot = candidate.find('.')
+            if dot == -1 or candidate.find('.', dot + 1) == -1:
+                break
+            candidate = candidate[dot + 1:]
+            if _is_public_suffix(candidate):
+                break
         
         self.stats['cache_misses'] += 1
         return None
     
     def _extract_domain_from_url(self, url: str) -> str:
-        """Extract domain from URL."""
+        """Extract domain (host without port or credentials) from URL."""
         try:
             if '://' in url:
                 url = url.split('://', 1)[1]
             
-            if '/' in url:
-                url = url.split('/', 1)[0]
+            for separator in ('/', '?', '#'):
+                if separator in url:
+                    url = url.split(separator, 1)[0]
+            
+            if '@' in url:
+                url = url.rsplit('@', 1)[1]
+            
+            if ':' in url:
+                url = url.split(':', 1)[0]
             
             return url.lower()
         except:
             return ""
     
     def batch_analyze_urls(self, urls: List[str]) -> List[Dict]:
-        """Parallel analysis of multiple URLs."""
-        if not urls:
-            return []
-        
+        """Analyze multiple URLs in a single tight pass."""
+        return self._batch_analyze_urls(urls)[0]
+    
+    def _batch_analyze_urls(self, urls: List[str]) -> Tuple[List[Dict], Dict[str, int]]:
+        """Analyze URLs, counting threat levels in the same pass that dedups them."""
         results = []
-        
-        # Use thread pool for parallel processing
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all URL analysis tasks
-            future_to_url = {
-                executor.submit(self._analyze_single_url, url): url 
-                for url in urls
-            }
+        level_counts = {}  # threat_level -> threats reported
+        if not urls:
+            return results, level_counts
+        
+        analyzed = {}  # url -> result (None when clean), computed once per batch
+        
+        # Each lookup is a few dict probes plus one trie-regex scan; a plain loop
+        # beats dispatching futures to threads that serialize on the GIL anyway.
+        # Results come from the cross-batch memo, so callers get their own copy
+        analyze_url = self._cached_url_analysis
+        stats = self.stats
+        for url in urls:
+            if url in analyzed:
+                result = analyzed[url]
+                if result:
+                    results.append(dict(result))
+                    level_counts[result['threat_level']] += 1
+                continue
             
-            # Collect results as they complete
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    result = future.result()
-                    if result:
-                        results.append(result)
-                except Exception as e:
-                    print(f"    [-] Eroare analiza URL {url}: {e}")
+            lookups = stats['total_lookups']
+            try:
+                result = analyze_url(url)
+            except Exception as e:
+                print(f"    [-] Eroare analiza URL {url}: {e}")
+                result = None
+            
+            # A memo hit skips _lookup_host; count it as the lookup it stands in for
+            # so the cache hit rate keeps covering every distinct URL per batch
+            if stats['total_lookups'] == lookups:
+                stats['total_lookups'] += 1
+                stats['cache_hits' if result else 'cache_misses'] += 1
+            
+            analyzed[url] = result
+            if result:
+                results.append(dict(result))
+                level = result['threat_level']
+                level_counts[level] = level_counts.get(level, 0) + 1
         
-        return results
+        return results, level_counts
     
     def _analyze_single_url(self, url: str) -> Optional[Dict]:
         """Analyze single URL for tracking patterns."""
+        # Extract the host once; it drives the lookup and is reported as-is
+        domain = self._extract_domain_from_url(url)
+        
         # Fast domain lookup first
-        threat_info = self.fast_domain_lookup(url)
-        if not threat_info:
+        indexed_domain = self._lookup_host(domain)
+        if not indexed_domain:
             return None
         
-        # Extract URL components
-        domain = self._extract_domain_from_url(url)
+        threat_info = self.domain_index[indexed_domain]
         
         # Build result
         result = {
             'url': url,
             'domain': domain,
-            'threat_level': threat_info['threat_level'],
-            'source': threat_info['source'],
-            'confidence': threat_info['confidence'],
-            'patterns_matched': len(threat_info['patterns']),
-            'is_malicious': threat_info['threat_level'] in ['critical', 'high']
+            'threat_level': threat_info.threat_level,
+            'source': threat_info.source,
+            'confidence': threat_info.confidence,
+            'patterns_matched': len(threat_info.patterns),
+            'is_malicious': threat_info.threat_level in _MALICIOUS_THREAT_LEVELS
         }
         
-        # Check URL patterns for this domain
-        base_domain = self._extract_base_domain(domain)
-        if base_domain in self.url_pattern_index:
-            for pattern in self.url_pattern_index[base_domain]:
-                if pattern.lower() in url.lower():
-                    result['url_pattern_match'] = pattern
-                    break
+        # Check MailTracker wildcard patterns with a single combined search
+        if self.mailtracker_matcher is not None:
+            match = self.mailtracker_matcher.search(url)
+            if match:
+                result['mailtracker_pattern_match'] = self._matched_mailtracker_pattern(url, match.start())
+        
+        # Check URL patterns for this domain (one automaton pass instead of a per-pattern scan)
+        if indexed_domain in self.url_pattern_domains:
+            match = self.url_pattern_matcher.search(url.lower())
+            if match:
+                result['url_pattern_match'] = match.group(0)
         
         return result
     
+    def _matched_mailtracker_pattern(self, url: str, start: int) -> Optional[str]:
+        """First MailTracker pattern matching at start - the branch the union took."""
+        for pattern, regex in zip(self.mailtracker_patterns, self.mailtracker_regexes):
+            if regex.match(url, start):
+                return pattern
+        return None
+    
     def extract_urls_from_content(self, content: str) -> List[str]:
         """Fast URL extraction using pre-compiled patterns."""
         urls = set()
         
-        # Use cached compiled patterns
-        img_pattern_hash = hashlib.md5(r'<img[^>]*src=[\"\']([^\"\']+)[\"\'][^>]*>'.encode()).hexdigest()
-        
-        if img_pattern_hash in self.regex_pattern_cache:
-            pattern = self.regex_pattern_cache[img_pattern_hash]
+        # Plain substring checks (C-level scans) skip regexes that cannot match,
+        # e.g. plaintext emails with no tags or attributes at all
+        content_lower = content.lower()
+        has_img = '<img' in content_lower
+        has_attributes = 'src=' in content_lower or 'href=' in content_lower
+        
+        # Use cached compiled patterns. The two scans stay separate: each pattern
+        # starts with a literal that re locates with its fast prefix search, while
+        # a fused '<img...|(?:src|href)=...' alternation loses that and measured
+        # ~20-30% slower on the test emails despite scanning the email only once
+        if has_img and _IMG_PATTERN_KEY in self.regex_pattern_cache:
+            pattern = self.regex_pattern_cache[_IMG_PATTERN_KEY]
             matches = pattern.findall(content)
             urls.update(matches)
         
-        # Additional fast extraction patterns
-        for pattern_key in ['href', 'background', 'url']:
-            pattern_hash = hashlib.md5(f'(?:src|href)=[\"\']([^\"\']*{pattern_key}[^\"\']*'.encode()).hexdigest()
-            if pattern_hash in self.regex_pattern_cache:
-                pattern = self.regex_pattern_cache[pattern_hash]
-                matches = pattern.findall(content)
-                urls.update(matches)
+        # Keyword attribute extraction in a single pass
+        if has_attributes and _EXTRACTION_PATTERN_KEY in self.regex_pattern_cache:
+            pattern = self.regex_pattern_cache[_EXTRACTION_PATTERN_KEY]
+            matches = pattern.findall(content)
+            urls.update(matches)
         
         return list(urls)
     
@@ -305,13 +651,13 @@ class OptimizedPatternEngine:
         # Fast URL extraction
         urls = self.extract_urls_from_content(email_content)
         
-        # Parallel URL analysis
-        threat_results = self.batch_analyze_urls(urls)
+        # Batch URL analysis, with per-level counts taken during the same pass
+        threat_results, level_counts = self._batch_analyze_urls(urls)
         
         # Calculate metrics
         total_threats = len(threat_results)
-        critical_threats = len([r for r in threat_results if r['threat_level'] == 'critical'])
-        high_threats = len([r for r in threat_results if r['threat_level'] == 'high'])
+        critical_threats = level_counts.get('critical', 0)
+        high_threats = level_counts.get('high', 0)
         
         analysis_time = time.time() - start_time
         
@@ -344,7 +690,7 @@ class OptimizedPatternEngine:
             },
             'memory_usage': {
                 'domain_index_size': len(self.domain_index),
-                'url_pattern_index_size': len(self.url_pattern_index),
+                'url_pattern_index_size': len(self.url_pattern_domains),
                 'regex_cache_size': len(self.regex_pattern_cache)
             }
         }
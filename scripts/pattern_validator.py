@@ -15,6 +15,7 @@ Validation Stages:
 
 import re
 import time
+import itertools
 import json
 import logging
 import threading
@@ -32,6 +33,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Domain extraction regexes used by community scoring, compiled once at import
+_DOMAIN_EXTRACTION_PATTERNS = (
+    re.compile(r'([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'),
+    re.compile(r'\|\|([^/^]+)'),
+    re.compile(r'://([^/]+)')
+)
+
+# Community scoring keyword sets, each matched in a single scan of the domain
+_TRACKER_KEYWORDS_RE = re.compile('track|analytics|ads|pixel')
+_LEGITIMATE_KEYWORDS_RE = re.compile('cdn|static|assets')
+
 @dataclass
 class ValidationResult:
     """Result of pattern validation"""
@@ -68,10 +80,24 @@ class PatternValidator:
         for directory in [self.validation_dir, self.test_data_dir, self.results_dir]:
             directory.mkdir(exist_ok=True)
         
-        # Load test datasets
-        self.legitimate_domains = self._load_legitimate_domains()
-        self.known_trackers = self._load_known_trackers()
+        # Load test datasets (domain sets are read-only lookup tables for every pattern)
+        self.legitimate_domains = frozenset(self._load_legitimate_domains())
+        self.known_trackers = frozenset(self._load_known_trackers())
         self.test_urls = self._load_test_urls()
+        self.performance_probe_urls = self.test_urls[:1000]
+        
+        # Probe URLs for the false positive stage don't depend on the pattern being
+        # validated, so they are expanded once here rather than on every validation
+        self.false_positive_probe_urls = self._build_probe_urls(
+            self.legitimate_domains,
+            ("https://{}/", "https://www.{}/index.html", "https://{}/contact.php", "https://mail.{}/inbox"),
+            500
+        )
+        self.tracker_probe_urls = self._build_probe_urls(
+            self.known_trackers,
+            ("https://{}/track.gif", "https://{}/pixel.png", "https://{}/collect.js"),
+            100
+        )
         
         # Performance thresholds
         self.performance_thresholds = {
@@ -146,6 +172,13 @@ class PatternValidator:
         
         return set(trackers_file.read_text().strip().split('\n'))
     
+    @staticmethod
+    def _build_probe_urls(domains: Set[str], templates: Tuple[str, ...], limit: int) -> List[str]:
+        """Expand domains through URL templates, keeping the first `limit` URLs"""
+        return list(itertools.islice(
+            (template.format(domain) for domain in domains for template in templates), limit
+        ))
+    
     def _load_test_urls(self) -> List[str]:
         """Load test URLs for performance testing"""
         urls_file = self.test_data_dir / "test_urls.txt"
@@ -155,7 +188,7 @@ class PatternValidator:
             test_urls = []
             
             # Add legitimate URLs
-            for domain in list(self.legitimate_domains)[:100]:
+            for domain in itertools.islice(self.legitimate_domains, 100):
                 test_urls.extend([
                     f"https://{domain}/",
                     f"https://{domain}/index.html",
@@ -165,7 +198,7 @@ class PatternValidator:
                 ])
             
             # Add tracking URLs
-            for domain in list(self.known_trackers)[:50]:
+            for domain in itertools.islice(self.known_trackers, 50):
                 test_urls.extend([
                     f"https://{domain}/track?pixel=1x1",
                     f"https://{domain}/collect.gif",
@@ -181,6 +214,10 @@ class PatternValidator:
     
     def validate_syntax(self, pattern: str, source: str = "") -> ValidationResult:
         """Stage 1: Validate pattern syntax and compilation"""
+        return self._validate_syntax(pattern, source)[0]
+    
+    def _validate_syntax(self, pattern: str, source: str = "") -> Tuple[ValidationResult, Optional[re.Pattern]]:
+        """Stage 1, also returning the compiled pattern for the later stages to reuse"""
         start_time = time.time()
         
         try:
@@ -223,7 +260,7 @@ class PatternValidator:
                 },
                 duration_ms=(time.time() - start_time) * 1000,
                 timestamp=time.time()
-            )
+            ), compiled_pattern
             
         except re.error as e:
             return ValidationResult(
@@ -238,20 +275,22 @@ class PatternValidator:
                 },
                 duration_ms=(time.time() - start_time) * 1000,
                 timestamp=time.time()
-            )
+            ), None
     
-    def validate_performance(self, pattern: str, source: str = "") -> ValidationResult:
+    def validate_performance(self, pattern: str, source: str = "",
+                             compiled_pattern: Optional[re.Pattern] = None) -> ValidationResult:
         """Stage 2: Test pattern performance against large URL dataset"""
         start_time = time.time()
         
         try:
-            compiled_pattern = re.compile(pattern)
+            if compiled_pattern is None:
+                compiled_pattern = re.compile(pattern)
             
             # Test performance on URL dataset
             match_times = []
             matches = 0
             
-            for url in self.test_urls[:1000]:  # Test on 1000 URLs
+            for url in self.performance_probe_urls:  # Test on 1000 URLs
                 match_start = time.perf_counter_ns()
                 if compiled_pattern.search(url):
                     matches += 1
@@ -278,7 +317,7 @@ class PatternValidator:
                     'avg_match_time_ns': avg_match_time,
                     'max_match_time_ns': max_match_time,
                     'total_matches': matches,
-                    'urls_tested': len(self.test_urls[:1000]),
+                    'urls_tested': len(self.performance_probe_urls),
                     'time_score': time_score,
                     'consistency_score': consistency_score
                 },
@@ -298,48 +337,34 @@ class PatternValidator:
                 timestamp=time.time()
             )
     
-    def validate_false_positives(self, pattern: str, source: str = "") -> ValidationResult:
+    def validate_false_positives(self, pattern: str, source: str = "",
+                                 compiled_pattern: Optional[re.Pattern] = None) -> ValidationResult:
         """Stage 3: Test for false positives against legitimate domains"""
         start_time = time.time()
         
         try:
-            compiled_pattern = re.compile(pattern)
+            if compiled_pattern is None:
+                compiled_pattern = re.compile(pattern)
             
             false_positives = []
-            legitimate_urls = []
-            
-            # Generate URLs from legitimate domains
-            for domain in self.legitimate_domains:
-                legitimate_urls.extend([
-                    f"https://{domain}/",
-                    f"https://www.{domain}/index.html",
-                    f"https://{domain}/contact.php",
-                    f"https://mail.{domain}/inbox"
-                ])
+            legitimate_urls = self.false_positive_probe_urls
             
             # Test for false positives
-            for url in legitimate_urls[:500]:  # Test 500 legitimate URLs
+            for url in legitimate_urls:  # Test 500 legitimate URLs
                 if compiled_pattern.search(url):
                     false_positives.append(url)
             
-            false_positive_rate = len(false_positives) / len(legitimate_urls[:500])
+            false_positive_rate = len(false_positives) / len(legitimate_urls)
             
             # Also test against known trackers (should match these)
             true_positives = []
-            tracker_urls = []
+            tracker_urls = self.tracker_probe_urls
             
-            for domain in self.known_trackers:
-                tracker_urls.extend([
-                    f"https://{domain}/track.gif",
-                    f"https://{domain}/pixel.png",
-                    f"https://{domain}/collect.js"
-                ])
-            
-            for url in tracker_urls[:100]:  # Test 100 tracker URLs
+            for url in tracker_urls:  # Test 100 tracker URLs
                 if compiled_pattern.search(url):
                     true_positives.append(url)
             
-            true_positive_rate = len(true_positives) / len(tracker_urls[:100]) if tracker_urls else 0
+            true_positive_rate = len(true_positives) / len(tracker_urls) if tracker_urls else 0
             
             # Scoring based on false positive rate and true positive rate
             fp_score = 1.0 - min(false_positive_rate / self.performance_thresholds['max_false_positive_rate'], 1.0)
@@ -454,27 +479,21 @@ class PatternValidator:
     def _extract_domains_from_pattern(self, pattern: str) -> List[str]:
         """Extract domain names from regex pattern"""
         # Simple domain extraction (in production would be more sophisticated)
-        domain_patterns = [
-            r'([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-            r'\|\|([^/^]+)',
-            r'://([^/]+)'
-        ]
-        
         domains = set()
-        for domain_pattern in domain_patterns:
-            matches = re.findall(domain_pattern, pattern)
+        for domain_pattern in _DOMAIN_EXTRACTION_PATTERNS:
+            matches = domain_pattern.findall(pattern)
             for match in matches:
                 if '.' in match and len(match) > 4:
                     domains.add(match.lower().strip('.'))
         
-        return list(domains)[:10]  # Limit to 10 domains
+        return list(itertools.islice(domains, 10))  # Limit to 10 domains
     
     def _simulate_community_score(self, domain: str) -> float:
         """Simulate community scoring (in production would query real database)"""
         # Simple simulation based on domain characteristics
-        if any(keyword in domain for keyword in ['track', 'analytics', 'ads', 'pixel']):
+        if _TRACKER_KEYWORDS_RE.search(domain):
             return 0.8  # Likely tracker
-        elif any(keyword in domain for keyword in ['cdn', 'static', 'assets']):
+        elif _LEGITIMATE_KEYWORDS_RE.search(domain):
             return 0.3  # Likely legitimate
         else:
             return 0.5  # Unknown
@@ -485,8 +504,9 @@ class PatternValidator:
         
         results = {}
         
-        # Stage 1: Syntax validation
-        syntax_result = self.validate_syntax(pattern, source)
+        # Stage 1: Syntax validation (its compiled pattern is reused below rather than
+        # recompiled per stage, which under batch load means re's bounded cache missing)
+        syntax_result, compiled_pattern = self._validate_syntax(pattern, source)
         results['syntax'] = syntax_result
         
         if not syntax_result.passed:
@@ -494,11 +514,11 @@ class PatternValidator:
             return results
         
         # Stage 2: Performance validation
-        performance_result = self.validate_performance(pattern, source)
+        performance_result = self.validate_performance(pattern, source, compiled_pattern)
         results['performance'] = performance_result
         
         # Stage 3: False positive validation
-        fp_result = self.validate_false_positives(pattern, source)
+        fp_result = self.validate_false_positives(pattern, source, compiled_pattern)
         results['false_positive'] = fp_result
         
         # Stage 4: Community scoring
@@ -513,6 +533,15 @@ class PatternValidator:
         
         return results
     
+    @staticmethod
+    def result_key(pattern: str, source: str) -> str:
+        """Key under which validate_patterns_batch reports a pattern's results
+        
+        Uses the full pattern: one batch can hold patterns from many changes, and
+        a truncated prefix would let two of them overwrite each other's results.
+        """
+        return f"{source}:{pattern}"
+    
     def validate_patterns_batch(self, patterns: List[Tuple[str, str]]) -> Dict[str, Dict[str, ValidationResult]]:
         """Validate multiple patterns concurrently"""
         logger.info(f"🚀 Starting batch validation of {len(patterns)} patterns")
@@ -530,7 +559,7 @@ class PatternValidator:
             pattern, source = futures[future]
             try:
                 pattern_results = future.result()
-                results[f"{source}:{pattern[:50]}"] = pattern_results
+                results[self.result_key(pattern, source)] = pattern_results
             except Exception as e:
                 logger.error(f"Validation failed for {source} pattern: {e}")
         
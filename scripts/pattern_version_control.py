@@ -25,6 +25,7 @@ from dataclasses import dataclass, asdict, field
 from datetime import datetime
 import uuid
 import copy
+import orjson
 
 # Setup logging
 logging.basicConfig(
@@ -166,9 +167,8 @@ class PatternVersionControl:
         if not branch_file.exists():
             return None
         
-        with open(branch_file, 'r') as f:
-            branch_data = json.load(f)
-            return branch_data.get('head_commit')
+        branch_data = orjson.loads(branch_file.read_bytes())
+        return branch_data.get('head_commit')
     
     def _save_commit(self, commit: PatternCommit):
         """Save a commit to storage"""
@@ -184,17 +184,15 @@ class PatternVersionControl:
         if not commit_file.exists():
             return None
         
-        with open(commit_file, 'r') as f:
-            commit_data = json.load(f)
-            return PatternCommit(**commit_data)
+        commit_data = orjson.loads(commit_file.read_bytes())
+        return PatternCommit(**commit_data)
     
     def _update_branch_head(self, branch: str, commit_id: str):
         """Update the head commit for a branch"""
         branch_file = self.branches_dir / f"{branch}.json"
         
         if branch_file.exists():
-            with open(branch_file, 'r') as f:
-                branch_data = json.load(f)
+            branch_data = orjson.loads(branch_file.read_bytes())
         else:
             branch_data = {"name": branch, "created": time.time()}
         
@@ -430,9 +428,7 @@ class PatternVersionControl:
         branches = []
         
         for branch_file in self.branches_dir.glob("*.json"):
-            with open(branch_file, 'r') as f:
-                branch_data = json.load(f)
-                branches.append(branch_data)
+            branches.append(orjson.loads(branch_file.read_bytes()))
         
         return branches
     
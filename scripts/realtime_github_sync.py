@@ -15,16 +15,17 @@ Features:
 
 import asyncio
 import aiohttp
-import json
 import hashlib
 import time
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 import threading
-import queue
+import collections
+import itertools
+import orjson
 
 # Setup logging
 logging.basicConfig(
@@ -56,11 +57,21 @@ class ChangeEvent:
     commit_sha: str
     changes: Dict
     validation_required: bool = True
+    
+    # Read-only views of the hot `changes` entries; properties rather than fields,
+    # so they stay out of asdict()/serialized events and the constructor
+    @property
+    def added_lines(self) -> List[str]:
+        return self.changes.get('added_lines', [])
+    
+    @property
+    def added_patterns(self) -> int:
+        return self.changes.get('added_patterns', 0)
 
 class GitHubChangeMonitor:
     """Real-time monitoring of GitHub repositories for tracking protection changes"""
     
-    def __init__(self):
+    def __init__(self, change_listener: Optional[Callable[[ChangeEvent], None]] = None):
         self.base_path = Path(__file__).parent.parent
         self.cache_dir = self.base_path / "cache"
         self.autoupdate_dir = self.base_path / "autoupdate"
@@ -72,7 +83,8 @@ class GitHubChangeMonitor:
         
         # Initialize sources and queues
         self.sources = self._load_sources()
-        self.change_queue = queue.Queue()
+        self.change_queue = collections.deque()  # append/popleft are atomic, no lock needed
+        self.change_listener = change_listener  # When set, changes are pushed to it instead of queued
         self.running = False
         self.monitor_thread = None
         
@@ -131,8 +143,7 @@ class GitHubChangeMonitor:
         # Load existing configuration if available
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    saved_config = json.load(f)
+                saved_config = orjson.loads(self.config_file.read_bytes())
                     
                 for name, source_data in saved_config.items():
                     if name in sources_config:
@@ -153,12 +164,12 @@ class GitHubChangeMonitor:
         for name, source in self.sources.items():
             config_data[name] = asdict(source)
         
-        with open(self.config_file, 'w') as f:
-            json.dump(config_data, f, indent=2)
+        with open(self.config_file, 'wb') as f:
+            f.write(orjson.dumps(config_data, option=orjson.OPT_INDENT_2))
     
     async def _check_rate_limit(self):
         """Check if we're within GitHub API rate limits"""
-        current_time = time.time()
+        current_time = time.monotonic()  # Window math only, never persisted
         
         # Remove timestamps older than 1 hour
         self.api_call_timestamps = [
@@ -283,8 +294,8 @@ class GitHubChangeMonitor:
             changes={
                 'added_patterns': len(added_lines),
                 'removed_patterns': len(removed_lines),
-                'added_lines': list(added_lines)[:10],  # Sample
-                'removed_lines': list(removed_lines)[:10],  # Sample
+                'added_lines': list(itertools.islice(added_lines, 10)),  # Sample
+                'removed_lines': list(itertools.islice(removed_lines, 10)),  # Sample
                 'total_lines': len(new_lines)
             }
         )
@@ -315,8 +326,11 @@ class GitHubChangeMonitor:
                     # Cache new content
                     cache_file.write_text(new_content, encoding='utf-8')
                     
-                    # Queue change for processing
-                    self.change_queue.put(change_event)
+                    # Hand the change to the listener, or queue it for polling
+                    if self.change_listener:
+                        self.change_listener(change_event)
+                    else:
+                        self.change_queue.append(change_event)
                     
                     logger.info(f"✅ {source.name}: Changes queued for processing")
                 else:
@@ -384,10 +398,10 @@ class GitHubChangeMonitor:
     def get_pending_changes(self) -> List[ChangeEvent]:
         """Get all pending change events"""
         changes = []
-        while not self.change_queue.empty():
+        while self.change_queue:
             try:
-                changes.append(self.change_queue.get_nowait())
-            except queue.Empty:
+                changes.append(self.change_queue.popleft())
+            except IndexError:
                 break
         return changes
     
@@ -396,7 +410,7 @@ class GitHubChangeMonitor:
         return {
             'running': self.running,
             'sources': len(self.sources),
-            'pending_changes': self.change_queue.qsize(),
+            'pending_changes': len(self.change_queue),
             'last_checks': {
                 name: {
                     'last_check': source.last_check,
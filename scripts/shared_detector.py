@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Shared Detector Access
+
+Process-wide FinalPixelDetector instance so every entry point (CLI, reporting
+demo, bulk worker processes) loads threat intelligence at most once per process.
+"""
+
+import threading
+
+from scripts.final_pixel_detector import FinalPixelDetector
+
+_detector = None
+_detector_lock = threading.Lock()
+
+def get_detector() -> FinalPixelDetector:
+    """Return the process-wide detector, creating and initializing it on first use."""
+    global _detector
+    
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                detector = FinalPixelDetector()
+                detector.initialize()
+                _detector = detector
+    
+    return _detector